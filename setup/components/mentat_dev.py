@@ -3,11 +3,17 @@ Mentat Developer Component
 Installs developer-only tools for maintaining the Mentat fork
 """
 
+import os
 from pathlib import Path
 from typing import Dict, List, Any, Optional
-import shutil
 from ..core.base import Component
-from ..utils.logger import get_logger
+from ..utils.fastcopy import copy_batch, ensure_dir, reset_known_dirs
+
+_REPO_ROOT = Path(__file__).resolve().parent.parent.parent
+_EXTENSIONS_DIR = _REPO_ROOT / "mentat-extensions"
+_SCRIPTS_DIR = _REPO_ROOT / "scripts"
+_DEV_SCRIPTS = ("version-bump.sh", "test-mentat-integration.sh", "cleanup.sh", "publish.sh")
+_DEV_SCRIPTS_SET = frozenset(_DEV_SCRIPTS)
 
 
 class MentatDevComponent(Component):
@@ -15,9 +21,9 @@ class MentatDevComponent(Component):
     
     def __init__(self, install_dir: Path = None):
         # Find the mentat-extensions directory relative to the setup module
-        self.extensions_dir = Path(__file__).parent.parent.parent / "mentat-extensions"
+        self.extensions_dir = _EXTENSIONS_DIR
+        # Component.__init__ sets self.logger
         super().__init__(install_dir)
-        self.logger = get_logger()
     
     def get_metadata(self) -> Dict[str, Any]:
         """Get component metadata"""
@@ -36,18 +42,26 @@ class MentatDevComponent(Component):
     
     def validate_prerequisites(self) -> bool:
         """Check if this is a development environment"""
-        # Check if we're in a git repository
-        git_dir = Path.cwd() / ".git"
-        mentat_repo_git = Path(__file__).parent.parent.parent / ".git"
+        try:
+            os.stat(self.extensions_dir)
+        except FileNotFoundError:
+            self.logger.error(f"mentat-extensions directory not found at {self.extensions_dir}")
+            return False
         
-        if not (git_dir.exists() or mentat_repo_git.exists()):
+        # Check if we're in a git repository; the Mentat checkout itself is the
+        # common case, so probe it first and skip the cwd check when it hits
+        try:
+            os.stat(_REPO_ROOT / ".git")
+            return True
+        except FileNotFoundError:
+            pass
+        
+        try:
+            os.stat(Path.cwd() / ".git")
+        except FileNotFoundError:
             self.logger.warning("mentat_dev component is intended for development environments with git repository")
             # Still allow installation but warn the user
         
-        if not self.extensions_dir.exists():
-            self.logger.error(f"mentat-extensions directory not found at {self.extensions_dir}")
-            return False
-        
         return True
     
     def _get_source_dir(self) -> Optional[Path]:
@@ -58,43 +72,37 @@ class MentatDevComponent(Component):
     def _install(self, config: Dict[str, Any]) -> bool:
         """Perform developer tools installation"""
         try:
+            # Directories may have been removed since an earlier run
+            reset_known_dirs()
+            
             agents_dir = self.install_dir / "agents"
             scripts_dir = self.install_dir / "scripts"
             
-            agents_dir.mkdir(parents=True, exist_ok=True)
-            scripts_dir.mkdir(parents=True, exist_ok=True)
+            ensure_dir(agents_dir)
+            ensure_dir(scripts_dir)
             
             installed_items = []
             
-            # Install the mentat-updater agent
-            updater_source = self.extensions_dir / "agents" / "agent-mentat-updater.md"
-            if updater_source.exists():
-                target = agents_dir / "agent-mentat-updater.md"
-                shutil.copy2(updater_source, target)
+            # The mentat-updater agent and developer scripts are copied if
+            # present; a missing source is reported by copy_batch
+            updater_job = (
+                self.extensions_dir / "agents" / "agent-mentat-updater.md",
+                agents_dir / "agent-mentat-updater.md",
+            )
+            script_jobs = [
+                (_SCRIPTS_DIR / script_name, scripts_dir / script_name)
+                for script_name in _DEV_SCRIPTS
+            ]
+            
+            if copy_batch([updater_job], copy_stat=False, missing_ok=True)[0]:
                 installed_items.append("Agent: @mentat-updater")
-                self.logger.debug("Installed agent-mentat-updater.md")
             else:
                 self.logger.warning("agent-mentat-updater.md not found")
             
-            # Install developer scripts
-            scripts_source = Path(__file__).parent.parent.parent / "scripts"
-            if scripts_source.exists():
-                dev_scripts = [
-                    "version-bump.sh",
-                    "test-mentat-integration.sh",
-                    "cleanup.sh",
-                    "publish.sh"
-                ]
-                
-                for script_name in dev_scripts:
-                    script_path = scripts_source / script_name
-                    if script_path.exists():
-                        target = scripts_dir / script_name
-                        shutil.copy2(script_path, target)
-                        # Make executable
-                        target.chmod(0o755)
-                        installed_items.append(f"Script: {script_name}")
-                        self.logger.debug(f"Installed script: {script_name}")
+            copied = copy_batch(script_jobs, mode=0o755, missing_ok=True)
+            for script_name, was_copied in zip(_DEV_SCRIPTS, copied):
+                if was_copied:
+                    installed_items.append(f"Script: {script_name}")
             
             if installed_items:
                 self.logger.info(f"Installed {len(installed_items)} Mentat developer components")
@@ -126,20 +134,19 @@ class MentatDevComponent(Component):
                     updater_path.unlink()
                     self.logger.debug("Removed agent-mentat-updater.md")
             
-            # Remove developer scripts
-            scripts_dir = self.install_dir / "scripts"
-            if scripts_dir.exists():
-                dev_scripts = [
-                    "version-bump.sh",
-                    "test-mentat-integration.sh",
-                    "cleanup.sh",
-                    "publish.sh"
-                ]
-                for script in dev_scripts:
-                    script_path = scripts_dir / script
-                    if script_path.exists():
-                        script_path.unlink()
-                        self.logger.debug(f"Removed script: {script}")
+            # Remove developer scripts found in one directory pass
+            try:
+                with os.scandir(self.install_dir / "scripts") as it:
+                    installed = [entry for entry in it if entry.name in _DEV_SCRIPTS_SET]
+            except FileNotFoundError:
+                installed = []
+            
+            for entry in installed:
+                try:
+                    os.unlink(entry.path)
+                except FileNotFoundError:
+                    continue
+                self.logger.debug(f"Removed script: {entry.name}")
             
             self.logger.info("Uninstalled Mentat developer tools")
             return True
@@ -176,17 +183,19 @@ class MentatDevComponent(Component):
         total_size = 0
         
         # Size of mentat-updater agent
-        if self.extensions_dir.exists():
-            updater_path = self.extensions_dir / "agents" / "agent-mentat-updater.md"
-            if updater_path.exists():
-                total_size += updater_path.stat().st_size
+        try:
+            total_size += os.stat(self.extensions_dir / "agents" / "agent-mentat-updater.md").st_size
+        except FileNotFoundError:
+            pass
         
-        # Add size of developer scripts
-        scripts_dir = Path(__file__).parent.parent.parent / "scripts"
-        if scripts_dir.exists():
-            for script in ["version-bump.sh", "test-mentat-integration.sh", "cleanup.sh", "publish.sh"]:
-                script_path = scripts_dir / script
-                if script_path.exists():
-                    total_size += script_path.stat().st_size
+        # Add size of developer scripts in one directory pass
+        # (symlinks are followed, as the install copies their targets)
+        try:
+            with os.scandir(_SCRIPTS_DIR) as it:
+                for entry in it:
+                    if entry.name in _DEV_SCRIPTS_SET and entry.is_file():
+                        total_size += entry.stat().st_size
+        except FileNotFoundError:
+            pass
         
         return total_size
\ No newline at end of file
@@ -3,13 +3,55 @@ Mentat Extensions Component
 Installs Mentat-specific agents and commands for dotfiles synchronization
 """
 
+import os
+import functools
 from pathlib import Path
-from typing import Dict, List, Any, Optional
-import shutil
+from typing import Dict, Iterator, List, Any, Optional
 from ..core.base import Component
-from ..utils.logger import get_logger
-from ..utils.mentat_config import MentatConfig
-from ..utils.claude_config import ClaudeConfigManager
+from ..utils.fastcopy import copy_batch, ensure_dir, forget_dir, reset_known_dirs
+
+_REPO_ROOT = Path(__file__).resolve().parent.parent.parent
+_EXTENSIONS_DIR = _REPO_ROOT / "mentat-extensions"
+_SCRIPTS_DIR = _REPO_ROOT / "scripts"
+_VERSION_FILE = _REPO_ROOT / "VERSION"
+_EXT_SCRIPTS = (
+    "sync-orchestrator.sh",
+    "health-monitor.sh",
+    "conflict-resolver.sh",
+    "framework-updater.sh",
+    "symlink-manager.sh",
+)
+_EXT_SCRIPTS_SET = frozenset(_EXT_SCRIPTS)
+
+
+def _iter_file_sizes(root: str, skip_name: str) -> Iterator[int]:
+    """Yield sizes of all files under root using scandir's cached dirent data"""
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name != skip_name and entry.is_file(follow_symlinks=False):
+                    yield entry.stat(follow_symlinks=False).st_size
+
+
+def _scan_markdown(directory: Path, skip_name: Optional[str] = None) -> List[os.DirEntry]:
+    """List .md files in directory with one scandir pass (empty if missing)"""
+    try:
+        with os.scandir(directory) as it:
+            return [
+                entry for entry in it
+                if entry.name.endswith(".md") and entry.name != skip_name and entry.is_file()
+            ]
+    except FileNotFoundError:
+        return []
+
+
+@functools.lru_cache(maxsize=1)
+def _version_bytes() -> bytes:
+    """Contents of the repo VERSION file, read once per process"""
+    return _VERSION_FILE.read_bytes().strip()
 
 
 class MentatExtensionsComponent(Component):
@@ -17,9 +59,9 @@ class MentatExtensionsComponent(Component):
     
     def __init__(self, install_dir: Path = None):
         # Find the mentat-extensions directory relative to the setup module
-        self.extensions_dir = Path(__file__).parent.parent.parent / "mentat-extensions"
+        self.extensions_dir = _EXTENSIONS_DIR
+        # Component.__init__ sets self.logger
         super().__init__(install_dir)
-        self.logger = get_logger()
     
     def get_metadata(self) -> Dict[str, Any]:
         """Get component metadata"""
@@ -51,59 +93,48 @@ class MentatExtensionsComponent(Component):
     def _install(self, config: Dict[str, Any]) -> bool:
         """Perform Mentat extensions installation"""
         try:
+            # Directories may have been removed since an earlier run
+            reset_known_dirs()
+            
             # Ensure target directories exist
             commands_dir = self.install_dir / "commands" / "mentat"
             agents_dir = self.install_dir / "agents"
             scripts_dir = self.install_dir / "scripts"
             
-            commands_dir.mkdir(parents=True, exist_ok=True)
-            agents_dir.mkdir(parents=True, exist_ok=True)
-            scripts_dir.mkdir(parents=True, exist_ok=True)
+            ensure_dir(commands_dir)
+            ensure_dir(agents_dir)
+            ensure_dir(scripts_dir)
             
             installed_items = []
+            md_jobs = []
             
-            # Install commands
-            commands_source = self.extensions_dir / "commands"
-            if commands_source.exists():
-                for cmd_file in commands_source.glob("*.md"):
-                    target = commands_dir / cmd_file.name
-                    shutil.copy2(cmd_file, target)
-                    installed_items.append(f"Command: /mentat:{cmd_file.stem}")
-                    self.logger.debug(f"Installed command: {cmd_file.name}")
+            # Collect commands; targets are plain strings built from the
+            # dirent names, no per-file Path objects
+            commands_target = os.fspath(commands_dir)
+            for entry in _scan_markdown(self.extensions_dir / "commands"):
+                md_jobs.append((entry.path, os.path.join(commands_target, entry.name)))
+                installed_items.append(f"Command: /mentat:{entry.name[:-3]}")
             
-            # Install agents (excluding mentat-updater which is developer-only)
-            agents_source = self.extensions_dir / "agents"
-            if agents_source.exists():
-                for agent_file in agents_source.glob("*.md"):
-                    # Skip the mentat-updater agent (it's in mentat_dev component)
-                    if agent_file.name == "agent-mentat-updater.md":
-                        continue
-                    
-                    target = agents_dir / agent_file.name
-                    shutil.copy2(agent_file, target)
-                    installed_items.append(f"Agent: @{agent_file.stem}")
-                    self.logger.debug(f"Installed agent: {agent_file.name}")
+            # Collect agents (excluding mentat-updater which is developer-only)
+            agents_target = os.fspath(agents_dir)
+            for entry in _scan_markdown(self.extensions_dir / "agents", skip_name="agent-mentat-updater.md"):
+                md_jobs.append((entry.path, os.path.join(agents_target, entry.name)))
+                installed_items.append(f"Agent: @{entry.name[:-3]}")
             
-            # Install supporting scripts
-            scripts_source = Path(__file__).parent.parent.parent / "scripts"
-            if scripts_source.exists():
-                important_scripts = [
-                    "sync-orchestrator.sh",
-                    "health-monitor.sh",
-                    "conflict-resolver.sh",
-                    "framework-updater.sh",
-                    "symlink-manager.sh"
-                ]
-                
-                for script_name in important_scripts:
-                    script_path = scripts_source / script_name
-                    if script_path.exists():
-                        target = scripts_dir / script_name
-                        shutil.copy2(script_path, target)
-                        # Make executable
-                        target.chmod(0o755)
-                        installed_items.append(f"Script: {script_name}")
-                        self.logger.debug(f"Installed script: {script_name}")
+            # Supporting scripts are copied if present; a missing source is
+            # reported by copy_batch rather than probed up front
+            script_jobs = [
+                (_SCRIPTS_DIR / script_name, scripts_dir / script_name)
+                for script_name in _EXT_SCRIPTS
+            ]
+            
+            # Installed files are independent copies, so editing them never
+            # touches the repository checkout
+            copy_batch(md_jobs, copy_stat=False)
+            copied = copy_batch(script_jobs, mode=0o755, missing_ok=True)
+            for script_name, was_copied in zip(_EXT_SCRIPTS, copied):
+                if was_copied:
+                    installed_items.append(f"Script: {script_name}")
             
             # Create .mentat directory for lock files and state
             mentat_dir = Path.home() / ".mentat"
@@ -111,12 +142,13 @@ class MentatExtensionsComponent(Component):
             self.logger.debug(f"Created .mentat directory at {mentat_dir}")
             
             # Store version information
-            version_file_source = Path(__file__).parent.parent.parent / "VERSION"
-            if version_file_source.exists():
-                version_content = version_file_source.read_text().strip()
-                version_file_target = self.install_dir / ".mentat-version"
-                version_file_target.write_text(version_content)
-                self.logger.debug(f"Stored version: {version_content}")
+            try:
+                version = _version_bytes()
+            except FileNotFoundError:
+                version = None
+            if version is not None:
+                (self.install_dir / ".mentat-version").write_bytes(version)
+                self.logger.debug(f"Stored version: {version.decode()}")
             
             if installed_items:
                 self.logger.info(f"Installed {len(installed_items)} Mentat components")
@@ -131,13 +163,15 @@ class MentatExtensionsComponent(Component):
     
     def _post_install(self) -> bool:
         """Post-installation tasks - configure dotfiles repository and update CLAUDE.md"""
+        # Imported here so listing components doesn't load the config/SSH stack
+        from ..utils.claude_config import ClaudeConfigManager
+        from ..utils.mentat_config import MentatConfig
+        
         try:
             # Update ~/.claude/CLAUDE.md with Mentat section
             self.logger.info("Updating CLAUDE.md with Mentat components...")
             claude_config = ClaudeConfigManager()
-            if claude_config.update_claude_md():
-                self.logger.success("Updated CLAUDE.md with Mentat section")
-            else:
+            if not claude_config.update_claude_md():
                 self.logger.warning("Could not update CLAUDE.md - may need manual update")
             
             # Configure dotfiles repository
@@ -169,11 +203,15 @@ class MentatExtensionsComponent(Component):
     
     def uninstall(self) -> bool:
         """Uninstall Mentat extensions"""
+        import shutil
+        from ..utils.claude_config import ClaudeConfigManager
+        
         try:
             # Remove commands directory
             commands_dir = self.install_dir / "commands" / "mentat"
             if commands_dir.exists():
                 shutil.rmtree(commands_dir)
+                forget_dir(commands_dir)
                 self.logger.debug("Removed Mentat commands")
             
             # Remove agents (only Mentat-specific ones)
@@ -185,19 +223,19 @@ class MentatExtensionsComponent(Component):
                     syncer_path.unlink()
                     self.logger.debug("Removed agent-syncer.md")
             
-            # Remove scripts
-            scripts_dir = self.install_dir / "scripts"
-            if scripts_dir.exists():
-                scripts_to_remove = [
-                    "sync-orchestrator.sh",
-                    "health-monitor.sh",
-                    "conflict-resolver.sh"
-                ]
-                for script in scripts_to_remove:
-                    script_path = scripts_dir / script
-                    if script_path.exists():
-                        script_path.unlink()
-                        self.logger.debug(f"Removed script: {script}")
+            # Remove installed scripts found in one directory pass
+            try:
+                with os.scandir(self.install_dir / "scripts") as it:
+                    installed = [entry for entry in it if entry.name in _EXT_SCRIPTS_SET]
+            except FileNotFoundError:
+                installed = []
+            
+            for entry in installed:
+                try:
+                    os.unlink(entry.path)
+                except FileNotFoundError:
+                    continue
+                self.logger.debug(f"Removed script: {entry.name}")
             
             # Remove Mentat section from CLAUDE.md
             self.logger.info("Removing Mentat section from CLAUDE.md...")
@@ -253,18 +291,20 @@ class MentatExtensionsComponent(Component):
         """Calculate total size of Mentat extensions"""
         total_size = 0
         
-        if self.extensions_dir.exists():
-            # Calculate size of commands and agents (excluding mentat-updater)
-            for item in self.extensions_dir.rglob("*"):
-                if item.is_file() and item.name != "agent-mentat-updater.md":
-                    total_size += item.stat().st_size
+        # Calculate size of commands and agents (excluding mentat-updater)
+        try:
+            total_size += sum(_iter_file_sizes(str(self.extensions_dir), "agent-mentat-updater.md"))
+        except FileNotFoundError:
+            pass
         
-        # Add size of scripts
-        scripts_dir = Path(__file__).parent.parent.parent / "scripts"
-        if scripts_dir.exists():
-            for script in ["sync-orchestrator.sh", "health-monitor.sh", "conflict-resolver.sh"]:
-                script_path = scripts_dir / script
-                if script_path.exists():
-                    total_size += script_path.stat().st_size
+        # Add size of the installed scripts in one directory pass
+        # (symlinks are followed, as the install copies their targets)
+        try:
+            with os.scandir(_SCRIPTS_DIR) as it:
+                for entry in it:
+                    if entry.name in _EXT_SCRIPTS_SET and entry.is_file():
+                        total_size += entry.stat().st_size
+        except FileNotFoundError:
+            pass
         
         return total_size
\ No newline at end of file
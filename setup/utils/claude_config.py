@@ -4,10 +4,73 @@ Manages the Mentat section in ~/.claude/CLAUDE.md
 """
 
 import os
+import re
+import itertools
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from ..utils.logger import get_logger
 
+# Start of a proper Mentat section, or of a fragment left behind by an older layout
+_SECTION_START_RE = re.compile(
+    r"(?P<proper># ═{51}\n# Mentat Framework Components)"
+    r"|\n# Mentat (?:= Personal Claude Code customization framework"
+    r"|Commands \((?:Dotfiles|Extensible\)))"
+)
+# Fragment patterns this close after a proper section start belong to that section;
+# starts arrive in order, so only the most recent proper start needs checking
+_PROPER_SECTION_SPAN = 500
+# Last line of every generated Mentat section
+_COMPONENT_COUNT_RE = re.compile(r"# Component Count:[^\n]*(?:\n|\Z)")
+# End of the section being replaced: its Component Count line or the next major section
+_SECTION_END_RE = re.compile(
+    r"(?P<count># Component Count:[^\n]*(?:\n|\Z))"
+    r"|\n\n# (?:═{7}|SuperClaude|Core Framework)"
+)
+# Where a fragment without a Component Count line stops
+_FRAGMENT_END_RE = re.compile(
+    r"\n\n# (?:═══════|SuperClaude|Core)|\n# Mentat (?:= Personal|Commands)"
+)
+# "description:" line of an agent's YAML frontmatter
+_AGENT_DESC_RE = re.compile(r"^[ \t]*description:(.*)", re.M)
+# Frontmatter is at the top of the file, so only this much is read
+_FRONTMATTER_READ_SIZE = 4096
+# Runs of blank lines collapsed after removing a section
+_BLANK_RUN_RE = re.compile(r"\n{4,}")
+_EXTRA_NEWLINES_RE = re.compile(r"\n{3,}")
+# Divider followed by optional whitespace and another divider
+_EMPTY_DIVIDERS_RE = re.compile(r"# ═{51}\n\s*\n*# ═{51}")
+# Divider with just whitespace before the next section
+_LONE_DIVIDER_RE = re.compile(r"\n# ═{51}\n\s*\n+(?=# ═{7})")
+# Fixed lines between the agent list and the script list of the section
+_CONFIG_AND_SECURITY_LINES = (
+    "",
+    "# Mentat Configuration",
+    "# - Config: ~/.mentat/config.json (0600)",
+    "# - Dotfiles: ~/dotfiles/ (symlinked)",
+    "# - Lock: ~/.mentat/sync.lock (0700)",
+    "# - Logs: ~/.mentat/sync.log",
+    "",
+    "# Mentat Security",
+    "# - SSH auth with passphrase protection",
+    "# - Input validation (emails, usernames, URLs)",
+    "# - Atomic permissions (0600 keys, 0700 dirs)",
+    "# - No credential storage",
+    "# - Sanitized commits",
+    "",
+    "# Mentat Scripts",
+)
+
+# MENTAT_SECTION_HEADER, for checking a file before decoding it
+_SECTION_HEADER_BYTES = b"# Mentat Framework Components"
+
+
+def _decode_text(raw: bytes) -> str:
+    """Decode file contents like a UTF-8 text-mode read, newlines included"""
+    text = raw.decode('utf-8')
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
 
 class ClaudeConfigManager:
     """Manages Mentat section in user's ~/.claude/CLAUDE.md file"""
@@ -20,105 +83,136 @@ class ClaudeConfigManager:
         self.logger = get_logger()
         self.claude_dir = Path.home() / ".claude"
         self.claude_md = self.claude_dir / "CLAUDE.md"
+        self.commands_dir = self.claude_dir / "commands"
+        self.commands_mentat_dir = self.commands_dir / "mentat"
+        self.agents_dir = self.claude_dir / "agents"
+        self.scripts_dir = self.claude_dir / "scripts"
+        # Entries of ~/.claude, listed once while a section is being generated
+        self._toplevel: Optional[Dict[str, os.DirEntry]] = None
         
     def _generate_mentat_section(self) -> str:
         """Generate the Mentat section content based on current installation"""
         
         # Scan for installed components
-        commands = self._scan_commands()
-        agents = self._scan_agents()
-        scripts = self._scan_scripts()
+        self._toplevel = self._list_claude_dir()
+        try:
+            commands = self._scan_commands()
+            agents = self._scan_agents()
+            scripts = self._scan_scripts()
+        finally:
+            self._toplevel = None
         
-        section = f"""
-{self.MENTAT_SECTION_START}
-{self.MENTAT_SECTION_HEADER}
-{self.MENTAT_SECTION_END}
-
-# Mentat = Personal Claude Code customization framework
-# Built on SuperClaude v4.0.8 | Add features as needed
-
-# Mentat Commands (Extensible)
-{self._format_commands(commands)}
-
-# Mentat Agents
-{self._format_agents(agents)}
-
-# Mentat Configuration
-# - Config: ~/.mentat/config.json (0600)
-# - Dotfiles: ~/dotfiles/ (symlinked)
-# - Lock: ~/.mentat/sync.lock (0700)
-# - Logs: ~/.mentat/sync.log
-
-# Mentat Security
-# - SSH auth with passphrase protection
-# - Input validation (emails, usernames, URLs)
-# - Atomic permissions (0600 keys, 0700 dirs)
-# - No credential storage
-# - Sanitized commits
-
-# Mentat Scripts
-{self._format_scripts(scripts)}
-
-# Component Count: Commands: {len(commands)} | Agents: {len(agents)} | Scripts: {len(scripts)}
-"""
-        return section
+        parts = [
+            "",
+            self.MENTAT_SECTION_START,
+            self.MENTAT_SECTION_HEADER,
+            self.MENTAT_SECTION_END,
+            "",
+            "# Mentat = Personal Claude Code customization framework",
+            "# Built on SuperClaude v4.0.8 | Add features as needed",
+            "",
+            "# Mentat Commands (Extensible)",
+        ]
+        self._format_commands(commands, parts)
+        parts += ("", "# Mentat Agents")
+        self._format_agents(agents, parts)
+        parts += _CONFIG_AND_SECURITY_LINES
+        self._format_scripts(scripts, parts)
+        parts += (
+            "",
+            f"# Component Count: Commands: {len(commands)} | Agents: {len(agents)} | Scripts: {len(scripts)}",
+            "",
+        )
+        return "\n".join(parts)
+    
+    def _list_claude_dir(self) -> Dict[str, os.DirEntry]:
+        """List ~/.claude once so the scanners can skip per-directory stat calls"""
+        try:
+            with os.scandir(self.claude_dir) as it:
+                return {entry.name: entry for entry in it}
+        except OSError:
+            return {}
+    
+    def _has_toplevel_dir(self, name: str) -> bool:
+        """Check whether ~/.claude contains the given directory"""
+        if self._toplevel is None:
+            return (self.claude_dir / name).is_dir()
+        entry = self._toplevel.get(name)
+        return entry is not None and entry.is_dir()
     
-    def _scan_commands(self) -> List[Dict[str, str]]:
+    def _scan_commands(self) -> List[Tuple[str, str]]:
         """Scan for installed Mentat commands"""
         commands = []
-        # Check both locations: direct commands and mentat subdirectory
-        command_dirs = [
-            Path.home() / ".claude" / "commands",
-            Path.home() / ".claude" / "commands" / "mentat"
-        ]
+        # A command installed in both locations is listed (and read) once
+        seen = set()
+        if not self._has_toplevel_dir("commands"):
+            return commands
         
-        for command_dir in command_dirs:
-            if command_dir.exists():
-                for cmd_file in command_dir.glob("*.md"):
-                    # Check if it's a mentat command (either by prefix or location)
-                    is_mentat = (cmd_file.stem.startswith("mentat-") or 
-                                command_dir.name == "mentat")
-                    
-                    if is_mentat:
-                        # Parse command file for description
-                        if cmd_file.stem.startswith("mentat-"):
-                            command_name = f"/mentat:{cmd_file.stem.replace('mentat-', '')}"
-                        else:
-                            command_name = f"/mentat:{cmd_file.stem}"
-                        
-                        description = self._get_command_description(cmd_file)
-                        commands.append({
-                            "name": command_name,
-                            "desc": description,
-                            "file": cmd_file.name
-                        })
+        # Direct commands: only mentat-*.md files belong to Mentat
+        has_mentat_dir = False
+        with os.scandir(self.commands_dir) as it:
+            for entry in it:
+                name = entry.name
+                if name.startswith("mentat-") and name.endswith(".md"):
+                    if entry.is_file():
+                        self._add_command(commands, seen, name[7:-3], entry)
+                elif name == "mentat" and entry.is_dir():
+                    has_mentat_dir = True
+        
+        # Mentat subdirectory: every .md file is a Mentat command
+        if has_mentat_dir:
+            with os.scandir(self.commands_mentat_dir) as it:
+                for entry in it:
+                    if not entry.name.endswith(".md") or not entry.is_file():
+                        continue
+                    stem = entry.name[:-3]
+                    if stem.startswith("mentat-"):
+                        stem = stem[7:]
+                    self._add_command(commands, seen, stem, entry)
         
         return commands
     
-    def _scan_agents(self) -> List[Dict[str, str]]:
+    def _add_command(self, commands: List[Tuple[str, str]], seen: set, name: str,
+                     entry: os.DirEntry) -> None:
+        """Append a command unless one with the same name was already found"""
+        command_name = f"/mentat:{name}"
+        if command_name in seen:
+            return
+        seen.add(command_name)
+        
+        # Parse command file for description
+        commands.append((command_name, self._get_command_description(entry.path)))
+    
+    def _scan_agents(self) -> List[Tuple[str, str]]:
         """Scan for installed Mentat agents"""
         agents = []
-        agent_dir = Path.home() / ".claude" / "agents"
+        seen = set()
+        agent_dir = self.agents_dir
         
-        if agent_dir.exists():
+        if self._has_toplevel_dir("agents"):
             # Look for Mentat category agents
-            for agent_file in agent_dir.glob("*.md"):
-                if self._is_mentat_agent(agent_file):
-                    agent_name = f"@{agent_file.stem.replace('agent-', '')}"
-                    description = self._get_agent_description(agent_file)
-                    agents.append({
-                        "name": agent_name,
-                        "desc": description
-                    })
+            with os.scandir(agent_dir) as it:
+                for entry in it:
+                    if not entry.name.endswith(".md") or not entry.is_file():
+                        continue
+                    agent_name = f"@{entry.name[:-3].replace('agent-', '')}"
+                    if agent_name in seen:
+                        continue
+                    # One read serves both the category check and the description
+                    head = self._read_agent_head(entry.path)
+                    if head is not None and self._is_mentat_agent(entry.name, head):
+                        seen.add(agent_name)
+                        description = self._get_agent_description(head)
+                        agents.append((agent_name, description))
         
         return agents
     
-    def _scan_scripts(self) -> List[Dict[str, str]]:
+    def _scan_scripts(self) -> List[Tuple[str, str]]:
         """Scan for installed Mentat scripts"""
         scripts = []
-        script_dir = Path.home() / ".claude" / "scripts"
+        script_dir = self.scripts_dir
         
-        if script_dir.exists():
+        if self._has_toplevel_dir("scripts"):
             # Key Mentat scripts to track
             key_scripts = [
                 ("sync-orchestrator.sh", "Core sync engine"),
@@ -128,173 +222,118 @@ class ClaudeConfigManager:
                 ("version-bump.sh", "Semver management"),
             ]
             
-            for script_name, description in key_scripts:
-                script_path = script_dir / script_name
+            for script in key_scripts:
+                script_path = script_dir / script[0]
                 if script_path.exists():
-                    scripts.append({
-                        "name": script_name,
-                        "desc": description
-                    })
+                    scripts.append(script)
         
         return scripts
     
-    def _format_commands(self, commands: List[Dict[str, str]]) -> str:
-        """Format commands for the section"""
+    def _format_commands(self, commands: List[Tuple[str, str]], parts: List[str]) -> None:
+        """Append the command lines for the section to parts"""
         if not commands:
-            return "# No Mentat commands installed"
+            parts.append("# No Mentat commands installed")
+            return
         
-        lines = []
-        for cmd in commands:
-            lines.append(f"{cmd['name']:<20} # {cmd['desc']}")
-        return "\n".join(lines)
+        parts.extend(["%-20s # %s" % cmd for cmd in commands])
     
-    def _format_agents(self, agents: List[Dict[str, str]]) -> str:
-        """Format agents for the section"""
+    def _format_agents(self, agents: List[Tuple[str, str]], parts: List[str]) -> None:
+        """Append the agent lines for the section to parts"""
         if not agents:
-            return "# No Mentat agents installed"
+            parts.append("# No Mentat agents installed")
+            return
         
-        lines = []
-        for agent in agents:
-            lines.append(f"{agent['name']:<20} # {agent['desc']}")
-        return "\n".join(lines)
+        parts.extend(["%-20s # %s" % agent for agent in agents])
     
-    def _format_scripts(self, scripts: List[Dict[str, str]]) -> str:
-        """Format scripts for the section"""
+    def _format_scripts(self, scripts: List[Tuple[str, str]], parts: List[str]) -> None:
+        """Append the script lines for the section to parts"""
         if not scripts:
-            return "# No Mentat scripts installed"
+            parts.append("# No Mentat scripts installed")
+            return
         
-        lines = []
-        for script in scripts:
-            lines.append(f"# - {script['name']:<25} # {script['desc']}")
-        return "\n".join(lines)
+        parts.extend(["# - %-25s # %s" % script for script in scripts])
     
-    def _get_command_description(self, cmd_file: Path) -> str:
+    def _get_command_description(self, cmd_file: str) -> str:
         """Extract description from command file"""
         try:
-            with open(cmd_file, 'r') as f:
-                lines = f.readlines()
-                for line in lines[:10]:  # Check first 10 lines
-                    if line.startswith("# Command:"):
-                        # Next non-empty line is usually description
-                        continue
-                    if line.strip() and not line.startswith("#"):
-                        return line.strip()[:50]  # Limit length
-        except:
-            pass
+            with open(cmd_file, 'r', encoding='utf-8') as f:
+                lines = list(itertools.islice(f, 10))  # Check first 10 lines
+        except (OSError, UnicodeDecodeError):
+            return "Mentat command"
+        
+        for line in lines:
+            if line.startswith("# Command:"):
+                # Next non-empty line is usually description
+                continue
+            if line.strip() and not line.startswith("#"):
+                return line.strip()[:50]  # Limit length
         return "Mentat command"
     
-    def _get_agent_description(self, agent_file: Path) -> str:
-        """Extract description from agent file"""
+    def _read_agent_head(self, agent_file: str) -> Optional[str]:
+        """Read the top of an agent file, where its YAML frontmatter lives"""
         try:
-            with open(agent_file, 'r') as f:
-                content = f.read()
-                # Look for description in YAML frontmatter
-                if "description:" in content:
-                    for line in content.split('\n'):
-                        if line.strip().startswith("description:"):
-                            desc = line.split(":", 1)[1].strip().strip('"').strip("'")
-                            return desc[:50]  # Limit length
-        except:
-            pass
+            with open(agent_file, 'r', encoding='utf-8') as f:
+                return f.read(_FRONTMATTER_READ_SIZE)
+        except (OSError, UnicodeDecodeError):
+            return None
+    
+    def _get_agent_description(self, head: str) -> str:
+        """Extract description from the top of an agent file"""
+        # Look for description in YAML frontmatter
+        match = _AGENT_DESC_RE.search(head)
+        if match:
+            desc = match.group(1).strip().strip('"').strip("'")
+            return desc[:50]  # Limit length
         return "Mentat agent"
     
-    def _is_mentat_agent(self, agent_file: Path) -> bool:
+    def _is_mentat_agent(self, file_name: str, head: str) -> bool:
         """Check if agent belongs to Mentat category"""
-        try:
-            with open(agent_file, 'r') as f:
-                content = f.read()
-                return "category: mentat" in content or "syncer" in agent_file.name or "mentat" in agent_file.name
-        except:
-            return False
+        return "category: mentat" in head or "syncer" in file_name or "mentat" in file_name
     
     def _clean_duplicate_sections(self, content: str) -> str:
         """Remove duplicate Mentat sections from content"""
-        # Find all Mentat sections - both proper and orphaned
-        sections_to_remove = []
-        
-        # Pattern 1: Proper sections with header
-        search_pos = 0
-        start_pattern = self.MENTAT_SECTION_START + "\n" + self.MENTAT_SECTION_HEADER
-        while True:
-            idx = content.find(start_pattern, search_pos)
-            if idx == -1:
-                break
-            sections_to_remove.append((idx, "proper"))
-            search_pos = idx + 1
-        
-        # Pattern 2: Orphaned content blocks (starting with "# Mentat =" or "# Mentat Commands")
-        orphan_patterns = [
-            "\n# Mentat = Personal Claude Code customization framework",
-            "\n# Mentat Commands (Dotfiles",
-            "\n# Mentat Commands (Extensible)"
-        ]
-        
-        for pattern in orphan_patterns:
-            search_pos = 0
-            while True:
-                idx = content.find(pattern, search_pos)
-                if idx == -1:
-                    break
-                # Check if this is part of a proper section already found
-                is_part_of_proper = any(
-                    start <= idx <= start + 500 
-                    for start, type in sections_to_remove 
-                    if type == "proper"
-                )
-                if not is_part_of_proper:
-                    sections_to_remove.append((idx, "orphan"))
-                search_pos = idx + 1
-        
-        # Sort by position
-        sections_to_remove.sort()
+        # Find all Mentat sections - both proper and orphaned - in one pass
+        starts = []
+        last_proper = None
+        for match in _SECTION_START_RE.finditer(content):
+            idx = match.start()
+            if match.lastgroup == "proper":
+                last_proper = idx
+            elif last_proper is not None and idx <= last_proper + _PROPER_SECTION_SPAN:
+                # Part of the proper section just found
+                continue
+            starts.append(idx)
         
         # If we have sections to remove (keeping none for fresh start)
-        if sections_to_remove:
-            self.logger.warning(f"Found {len(sections_to_remove)} Mentat section(s)/fragment(s), cleaning up...")
+        if starts:
+            self.logger.warning(f"Found {len(starts)} Mentat section(s)/fragment(s), cleaning up...")
             
-            # Remove all sections/fragments
-            cleaned = content
-            for start_idx, section_type in reversed(sections_to_remove):
-                # Find end of this section/fragment
-                component_count_idx = cleaned.find("# Component Count:", start_idx)
-                if component_count_idx != -1:
-                    end_idx = cleaned.find("\n", component_count_idx) + 1
+            # Keep the text between sections/fragments; each one ends at its
+            # Component Count line, the next major section, or the next start
+            pieces = [content[:starts[0]]]
+            for i, start_idx in enumerate(starts):
+                next_start = starts[i + 1] if i + 1 < len(starts) else len(content)
+                match = _COMPONENT_COUNT_RE.search(content, start_idx, next_start)
+                if match is None:
+                    # Skip current line before looking for the next section
+                    match = _FRAGMENT_END_RE.search(content, start_idx + 50, next_start)
+                    end_idx = match.start() if match else next_start
                 else:
-                    # Look for next major section or divider
-                    end_idx = len(cleaned)
-                    search_start = start_idx + 50  # Skip current line
-                    
-                    # Possible end markers
-                    end_markers = [
-                        "\n\n# ═══════",  # Next section divider
-                        "\n\n# SuperClaude",  # SuperClaude section
-                        "\n\n# Core",  # Core framework
-                        "\n# Mentat = Personal",  # Another orphan
-                        "\n# Mentat Commands"  # Another orphan
-                    ]
-                    
-                    for marker in end_markers:
-                        idx = cleaned.find(marker, search_start)
-                        if idx != -1 and idx < end_idx:
-                            end_idx = idx
-                
-                # Remove this section/fragment
-                cleaned = cleaned[:start_idx] + cleaned[end_idx:]
+                    end_idx = match.end()
+                pieces.append(content[end_idx:next_start])
+            cleaned = "".join(pieces)
             
             # Clean up excessive blank lines
-            while "\n\n\n\n" in cleaned:
-                cleaned = cleaned.replace("\n\n\n\n", "\n\n\n")
+            cleaned = _BLANK_RUN_RE.sub("\n\n\n", cleaned)
             
-            # Clean up orphaned dividers (dividers with no content between them)
-            import re
-            # Pattern: divider followed by optional whitespace and another divider
-            divider_pattern = r'# ═══════════════════════════════════════════════════\n\s*\n*# ═══════════════════════════════════════════════════'
-            while re.search(divider_pattern, cleaned):
-                cleaned = re.sub(divider_pattern, '', cleaned)
+            # Clean up orphaned dividers (dividers with no content between them);
+            # repeat while a removal still joins two dividers together
+            removed = 1
+            while removed:
+                cleaned, removed = _EMPTY_DIVIDERS_RE.subn('', cleaned)
             
             # Clean up lone dividers (divider with just whitespace before next section)
-            lone_divider = r'\n# ═══════════════════════════════════════════════════\n\s*\n+(?=# ═══════)'
-            cleaned = re.sub(lone_divider, '\n\n', cleaned)
+            cleaned = _LONE_DIVIDER_RE.sub('\n\n', cleaned)
             
             return cleaned
         
@@ -306,12 +345,13 @@ class ClaudeConfigManager:
             # Ensure directory exists
             self.claude_dir.mkdir(exist_ok=True)
             
-            # Read existing content or create new
-            if self.claude_md.exists():
-                with open(self.claude_md, 'r') as f:
-                    content = f.read()
-            else:
-                content = ""
+            # Read existing content or create new; the raw bytes are kept to
+            # compare against the result before writing
+            try:
+                raw = self.claude_md.read_bytes()
+            except FileNotFoundError:
+                raw = b""
+            content = _decode_text(raw)
             
             # Clean up any duplicate sections first
             content = self._clean_duplicate_sections(content)
@@ -327,54 +367,47 @@ class ClaudeConfigManager:
                 # Find start of Mentat section
                 start_idx = content.find(start_marker)
                 if start_idx != -1:
-                    # Find end of section by looking for the Component Count line
-                    # which marks the end of each Mentat section
-                    component_count_idx = content.find("# Component Count:", start_idx)
-                    if component_count_idx != -1:
-                        # Find the newline after Component Count line
-                        end_of_line = content.find("\n", component_count_idx)
-                        if end_of_line != -1:
-                            end_idx = end_of_line + 1
-                        else:
-                            end_idx = len(content)
-                    else:
-                        # Fallback: look for next non-Mentat section
-                        # Skip the immediate closing divider by searching further
-                        search_start = start_idx + len(start_marker) + 100  # Skip header block
-                        next_section_markers = [
-                            "\n\n# ═══════",  # Another major section with blank line
-                            "\n\n# SuperClaude",  # SuperClaude section
-                            "\n\n# Core Framework",  # Other framework sections
-                        ]
-                        
+                    # The section ends with its Component Count line; failing that,
+                    # at the next non-Mentat section
+                    match = _SECTION_END_RE.search(content, start_idx + len(start_marker))
+                    if match is None:
                         end_idx = len(content)
-                        for marker in next_section_markers:
-                            idx = content.find(marker, search_start)
-                            if idx != -1 and idx < end_idx:
-                                end_idx = idx
+                    elif match.lastgroup == "count":
+                        end_idx = match.end()
+                    else:
+                        end_idx = match.start()
                     
                     # Replace the section
-                    content = content[:start_idx] + new_section + content[end_idx:]
-                    
-                    self.logger.info("Updated existing Mentat section in CLAUDE.md")
+                    content = "".join((content[:start_idx], new_section, content[end_idx:]))
+                    message = "Updated existing Mentat section in CLAUDE.md"
                 else:
                     # Section header exists but not properly formatted, append new
                     content += "\n" + new_section
-                    self.logger.info("Added Mentat section to CLAUDE.md")
+                    message = "Added Mentat section to CLAUDE.md"
             else:
-                # Add new section at the end
-                if content and not content.endswith('\n'):
+                # Add new section at the end. The section starts with its own
+                # blank line, so trailing newlines (including the one left by
+                # removing the previous copy) are trimmed to keep reruns stable
+                content = content.rstrip('\n')
+                if content:
                     content += '\n'
                 content += new_section
-                self.logger.info("Added Mentat section to CLAUDE.md")
+                message = "Added Mentat section to CLAUDE.md"
+            
+            # Nothing to write when the regenerated file is identical
+            data = content.encode('utf-8')
+            if data == raw:
+                self.logger.info("Mentat section in CLAUDE.md is already up to date")
+                return True
             
             # Write updated content
-            with open(self.claude_md, 'w') as f:
-                f.write(content)
+            self.claude_md.write_bytes(data)
             
             # Set appropriate permissions
-            self.claude_md.chmod(0o644)
+            if self.claude_md.stat().st_mode & 0o777 != 0o644:
+                self.claude_md.chmod(0o644)
             
+            self.logger.success(message)
             return True
             
         except Exception as e:
@@ -384,14 +417,15 @@ class ClaudeConfigManager:
     def remove_mentat_section(self) -> bool:
         """Remove Mentat section from ~/.claude/CLAUDE.md (for uninstall)"""
         try:
-            if not self.claude_md.exists():
+            try:
+                raw = self.claude_md.read_bytes()
+            except FileNotFoundError:
                 return True
             
-            with open(self.claude_md, 'r') as f:
-                content = f.read()
-            
-            if self.MENTAT_SECTION_HEADER not in content:
+            # Check the raw bytes so a file without the section is never decoded
+            if _SECTION_HEADER_BYTES not in raw:
                 return True  # Already removed
+            content = _decode_text(raw)
             
             # Find and remove Mentat section
             start_marker = self.MENTAT_SECTION_START + "\n" + self.MENTAT_SECTION_HEADER
@@ -414,12 +448,10 @@ class ClaudeConfigManager:
                 content = content[:start_idx] + content[end_idx:]
                 
                 # Clean up extra newlines
-                while "\n\n\n" in content:
-                    content = content.replace("\n\n\n", "\n\n")
+                content = _EXTRA_NEWLINES_RE.sub("\n\n", content)
                 
                 # Write updated content
-                with open(self.claude_md, 'w') as f:
-                    f.write(content)
+                self.claude_md.write_text(content, encoding='utf-8')
                 
                 self.logger.info("Removed Mentat section from CLAUDE.md")
             
@@ -0,0 +1,222 @@
+"""
+Fast file copy helpers for Mentat component installation
+Uses the platform's zero-copy primitive instead of a user-space read/write loop,
+and remembers which install directories already exist
+"""
+
+import os
+import sys
+import stat
+import errno
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple, Union
+
+PathType = Union[str, Path]
+
+# sendfile(2) only accepts regular-file destinations on Linux; macOS needs a
+# socket there, so it goes through shutil.copy2 which already uses fcopyfile.
+_USE_SENDFILE = sys.platform.startswith("linux") and hasattr(os, "sendfile")
+
+_CopyFileExW = None
+if sys.platform == "win32":
+    try:
+        import ctypes
+        _CopyFileExW = ctypes.windll.kernel32.CopyFileExW
+    except (ImportError, AttributeError):
+        _CopyFileExW = None
+
+# Copies are I/O bound and release the GIL, so a few threads overlap latency
+_MAX_COPY_WORKERS = 8
+
+# Directories created (or found) by ensure_dir, plus their ancestors; only
+# trusted within one install run, see reset_known_dirs
+_known_dirs = set()
+
+# Errors meaning "sendfile is not supported for these files", not a real failure
+_SENDFILE_UNSUPPORTED = {errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP, errno.ENOTSUP}
+
+
+def fastcopy(src: PathType, dst: PathType, copy_stat: bool = True) -> None:
+    """
+    Copy a file, like shutil.copy2 (or shutil.copyfile without copy_stat)
+
+    Args:
+        src: Source file path
+        dst: Target file path (overwritten if it exists)
+        copy_stat: Whether to preserve mode and timestamps
+    """
+    if _USE_SENDFILE:
+        _sendfile_copy(src, dst, copy_stat)
+    elif _CopyFileExW is not None:
+        if not _CopyFileExW(os.fspath(src), os.fspath(dst), None, None, None, 0):
+            raise ctypes.WinError()
+    else:
+        _portable_copy(src, dst, copy_stat)
+
+
+def install_executable(src: PathType, dst: PathType, mode: int = 0o755) -> None:
+    """
+    Copy a file and set its permission bits in the same pass
+
+    On Linux the mode is applied with fchmod on the open target descriptor,
+    so the target path is not resolved a second time.
+
+    Args:
+        src: Source file path
+        dst: Target file path (overwritten if it exists)
+        mode: Permission bits for the target
+    """
+    if _USE_SENDFILE:
+        _sendfile_copy(src, dst, copy_stat=False, mode=mode)
+    else:
+        fastcopy(src, dst, copy_stat=False)
+        os.chmod(dst, mode)
+
+
+def _portable_copy(src: PathType, dst: PathType, copy_stat: bool) -> None:
+    """Copy with shutil, imported only when a copy actually needs it"""
+    import shutil
+    if copy_stat:
+        shutil.copy2(src, dst)
+    else:
+        shutil.copyfile(src, dst)
+
+
+def _sendfile_copy(src: PathType, dst: PathType, copy_stat: bool,
+                   mode: Optional[int] = None) -> None:
+    """Copy src to dst in-kernel with sendfile(2), then apply the cached stat or mode"""
+    st = os.stat(src)
+    if mode is None and copy_stat:
+        mode = stat.S_IMODE(st.st_mode)
+    in_fd = os.open(src, os.O_RDONLY | os.O_CLOEXEC)
+    try:
+        # Truncate only after checking the target is not the source itself
+        # (same path or a hard link), which shutil reports as SameFileError
+        out_fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_CLOEXEC,
+                         0o666 if mode is None else mode)
+        try:
+            out_st = os.fstat(out_fd)
+            if (out_st.st_dev, out_st.st_ino) == (st.st_dev, st.st_ino):
+                import shutil
+                raise shutil.SameFileError(f"{src!r} and {dst!r} are the same file")
+            os.ftruncate(out_fd, 0)
+
+            blocksize = max(st.st_size, 1 << 20)
+            copied = 0
+            while True:
+                try:
+                    sent = os.sendfile(out_fd, in_fd, None, blocksize)
+                except OSError as e:
+                    if copied == 0 and e.errno in _SENDFILE_UNSUPPORTED:
+                        break
+                    raise
+                if sent == 0:
+                    break
+                copied += sent
+
+            if copied == 0 and st.st_size > 0:
+                # Filesystem refused sendfile; use the portable path instead
+                os.close(out_fd)
+                out_fd = -1
+                _portable_copy(src, dst, copy_stat)
+                if mode is not None:
+                    os.chmod(dst, mode)
+                return
+
+            # O_CREAT's mode is masked by umask and ignored for existing files
+            if mode is not None:
+                os.fchmod(out_fd, mode)
+            if copy_stat:
+                os.utime(out_fd, ns=(st.st_atime_ns, st.st_mtime_ns))
+        finally:
+            if out_fd != -1:
+                os.close(out_fd)
+    finally:
+        os.close(in_fd)
+
+
+def copy_batch(jobs: Iterable[Tuple[PathType, PathType]], copy_stat: bool = True,
+               mode: Optional[int] = None, missing_ok: bool = False) -> List[bool]:
+    """
+    Copy a batch of independent files
+
+    Callers collect every (source, target) pair for an install up front and
+    submit them here in one call. Targets must be distinct; the copies run
+    concurrently on a small thread pool and the first failure is re-raised.
+
+    Args:
+        jobs: Iterable of (source, target) path pairs
+        copy_stat: Whether to preserve mode and timestamps
+        mode: Install targets with these permission bits (see install_executable)
+        missing_ok: Skip jobs whose source does not exist instead of raising
+
+    Returns:
+        One flag per job, in order: True if copied, False if skipped
+    """
+    jobs = list(jobs)
+    if not jobs:
+        return []
+
+    def _copy_one(job: Tuple[PathType, PathType]) -> bool:
+        src, dst = job
+        try:
+            if mode is not None:
+                install_executable(src, dst, mode)
+            else:
+                fastcopy(src, dst, copy_stat)
+        except FileNotFoundError as e:
+            # Only a missing source is skippable; a missing target dir is a bug
+            if missing_ok and e.filename == os.fspath(src):
+                return False
+            raise
+        return True
+
+    if len(jobs) == 1:
+        return [_copy_one(jobs[0])]
+
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=min(_MAX_COPY_WORKERS, len(jobs))) as executor:
+        return list(executor.map(_copy_one, jobs))
+
+
+def ensure_dir(path: PathType) -> None:
+    """
+    Create a directory and its parents unless an earlier call already did
+
+    Repeated calls within one install run (since the last reset_known_dirs)
+    skip the mkdir probes for directories known to exist.
+
+    Args:
+        path: Directory to create
+    """
+    key = os.fspath(path)
+    if key in _known_dirs:
+        return
+    path = Path(key)
+    path.mkdir(parents=True, exist_ok=True)
+    _known_dirs.add(key)
+    _known_dirs.update(os.fspath(parent) for parent in path.parents)
+
+
+def forget_dir(path: PathType) -> None:
+    """
+    Drop a removed directory and everything below it from the ensure_dir cache
+
+    Args:
+        path: Directory that was deleted
+    """
+    key = os.fspath(path)
+    prefix = key + os.sep
+    _known_dirs.difference_update(
+        [known for known in _known_dirs if known == key or known.startswith(prefix)]
+    )
+
+
+def reset_known_dirs() -> None:
+    """
+    Forget every directory recorded by ensure_dir
+
+    Called at the start of each install run, since directories may have been
+    removed since (e.g. by an uninstall) without going through forget_dir.
+    """
+    _known_dirs.clear()
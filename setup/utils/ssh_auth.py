@@ -4,13 +4,46 @@ Handles SSH key setup, verification, and GitHub integration
 """
 
 import os
+import re
+import time
+import string
+import shutil
 import subprocess
 import platform
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Tuple, Dict, Any
+from typing import Optional, Tuple, Dict, Any, List, Union
 from ..utils.logger import get_logger
 from ..utils.ui import Colors, confirm
 
+# How long a check_ssh_setup result is reused (seconds); covers one wizard run
+_STATUS_TTL = 30.0
+
+# Upper bound for ssh-add loading a key, which may prompt for its passphrase
+_PASSPHRASE_TIMEOUT = 120
+
+# How long one `ssh-add -l` answer is reused for both agent checks (seconds)
+_AGENT_TTL = 2.0
+
+# Clipboard commands tried per platform, in order of preference
+_CLIPBOARD_COMMANDS = {
+    "Darwin": [["pbcopy"]],
+    "Linux": [["xclip", "-selection", "clipboard"], ["xsel", "--clipboard", "--input"]],
+    "Windows": [["clip"]],
+}
+
+# Variable assignments in `ssh-agent -s` output, e.g. "SSH_AGENT_PID=123; export ..."
+_AGENT_RE = re.compile(r'^(SSH_[A-Z_]+)=([^;]+);', re.M)
+
+# Deletes the shell metacharacters never allowed in the ssh-keygen comment, so
+# the scan is one C-level translate
+_EMAIL_BAD_CHARS_TABLE = str.maketrans('', '', ';|&$`\\"\'\n\r<>')
+
+# Character sets of local@domain.tld, checked by a linear scan instead of a regex
+_EMAIL_LOCAL_CHARS = frozenset(string.ascii_letters + string.digits + "._%+-")
+_EMAIL_DOMAIN_CHARS = frozenset(string.ascii_letters + string.digits + ".-")
+_EMAIL_TLD_CHARS = frozenset(string.ascii_letters)
+
 
 class SSHAuthHelper:
     """Manages SSH authentication for private repository access"""
@@ -19,16 +52,28 @@ class SSHAuthHelper:
         self.logger = get_logger()
         self.ssh_dir = Path.home() / ".ssh"
         self.known_hosts = self.ssh_dir / "known_hosts"
+        # Key paths are resolved once here rather than expanded per check
         self.ssh_key_types = [
-            ("ed25519", "~/.ssh/id_ed25519", "Recommended - most secure"),
-            ("rsa", "~/.ssh/id_rsa", "Legacy - widely compatible"),
-            ("ecdsa", "~/.ssh/id_ecdsa", "Alternative - good security")
+            ("ed25519", self.ssh_dir / "id_ed25519", "Recommended - most secure"),
+            ("rsa", self.ssh_dir / "id_rsa", "Legacy - widely compatible"),
+            ("ecdsa", self.ssh_dir / "id_ecdsa", "Alternative - good security")
         ]
+        self._status_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+        self._agent_cache: Optional[Tuple[float, Tuple[bool, List[str]]]] = None
+        # Tool paths resolved on first use; None when not installed
+        self._bin: Dict[str, Optional[str]] = {}
+        # Clipboard command: False until probed, None if none works
+        self._clip_cmd: Union[List[str], None, bool] = False
     
     def check_ssh_setup(self) -> Dict[str, Any]:
-        """Check current SSH setup status"""
+        """Check current SSH setup status, reusing a result younger than _STATUS_TTL"""
+        cached = self._status_cache
+        if cached is not None and time.monotonic() - cached[0] < _STATUS_TTL:
+            return cached[1]
+        
+        ssh_files = self._list_ssh_dir()
         status = {
-            "has_ssh_dir": self.ssh_dir.exists(),
+            "has_ssh_dir": ssh_files is not None,
             "has_keys": False,
             "key_files": [],
             "agent_running": False,
@@ -36,25 +81,59 @@ class SSHAuthHelper:
             "github_verified": False
         }
         
-        # Check for SSH keys
-        for key_type, key_path, _ in self.ssh_key_types:
-            key_file = Path(os.path.expanduser(key_path))
-            if key_file.exists():
-                status["has_keys"] = True
-                status["key_files"].append(str(key_file))
-        
-        # Check SSH agent
-        status["agent_running"] = self._check_ssh_agent()
+        # Check for SSH keys; a missing ~/.ssh was already listed as empty
+        for key_file in self._existing_keys(ssh_files if ssh_files is not None else set()):
+            status["has_keys"] = True
+            status["key_files"].append(str(key_file))
         
-        # Check loaded keys
-        if status["agent_running"]:
-            status["keys_loaded"] = self._get_loaded_keys()
-        
-        # Check GitHub authentication
-        status["github_verified"] = self._verify_github_auth()
+        # The agent and GitHub authentication are independent probes, so run
+        # them concurrently; the GitHub one dominates on slow networks
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            agent_future = executor.submit(self._probe_agent)
+            github_future = executor.submit(self._verify_github_auth)
+            
+            status["agent_running"], keys_loaded = agent_future.result()
+            if status["agent_running"]:
+                status["keys_loaded"] = list(keys_loaded)
+            status["github_verified"] = github_future.result()
         
+        self._status_cache = (time.monotonic(), status)
         return status
     
+    def _list_ssh_dir(self) -> Optional[set]:
+        """Names of the files in ~/.ssh, read in one pass; None if it doesn't exist"""
+        try:
+            with os.scandir(self.ssh_dir) as entries:
+                return {entry.name for entry in entries if entry.is_file()}
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        except OSError:
+            # Exists but can't be listed
+            return set()
+    
+    def _existing_keys(self, ssh_files: Optional[set] = None) -> list:
+        """Key files from ssh_key_types present in ~/.ssh, in preference order"""
+        if ssh_files is None:
+            ssh_files = self._list_ssh_dir() or set()
+        return [key_file for _, key_file, _ in self.ssh_key_types if key_file.name in ssh_files]
+    
+    def _invalidate_status(self) -> None:
+        """Drop the cached status after keys or the agent have changed"""
+        self._status_cache = None
+        self._agent_cache = None
+    
+    def _github_verified(self, fresh: bool = False) -> bool:
+        """GitHub SSH access from the cached status, probed directly when fresh or uncached"""
+        cached = self._status_cache
+        if not fresh and cached is not None and time.monotonic() - cached[0] < _STATUS_TTL:
+            return cached[1]["github_verified"]
+        
+        # Only this field can have changed; the rest of a cached status stays valid
+        verified = self._verify_github_auth()
+        if cached is not None:
+            cached[1]["github_verified"] = verified
+        return verified
+    
     def setup_ssh_interactive(self) -> bool:
         """Interactive SSH setup wizard"""
         print(f"\n{Colors.CYAN}{Colors.BRIGHT}SSH Authentication Setup{Colors.RESET}")
@@ -100,20 +179,25 @@ class SSHAuthHelper:
     
     def _validate_email(self, email: str) -> bool:
         """Validate email address for SSH key generation"""
-        import re
-        # RFC 5322 compliant email validation
-        email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        
         # Security checks
         if not email or len(email) > 254:
             return False
         
         # Check for shell metacharacters that could cause injection
-        dangerous_chars = [';', '|', '&', '$', '`', '\\', '"', "'", '\n', '\r', '<', '>']
-        if any(char in email for char in dangerous_chars):
+        if len(email.translate(_EMAIL_BAD_CHARS_TABLE)) != len(email):
             return False
-            
-        return bool(re.match(email_pattern, email))
+        
+        local, _, domain = email.rpartition('@')
+        if not local or not _EMAIL_LOCAL_CHARS.issuperset(local):
+            return False
+        
+        host, _, tld = domain.rpartition('.')
+        return (
+            bool(host)
+            and len(tld) >= 2
+            and _EMAIL_DOMAIN_CHARS.issuperset(host)
+            and _EMAIL_TLD_CHARS.issuperset(tld)
+        )
     
     def _generate_new_key(self) -> bool:
         """Generate a new SSH key"""
@@ -140,8 +224,7 @@ class SSHAuthHelper:
         except:
             idx = 0
         
-        key_type, key_path, _ = self.ssh_key_types[idx]
-        key_file = Path(os.path.expanduser(key_path))
+        key_type, key_file, _ = self.ssh_key_types[idx]
         
         # Check if key already exists
         if key_file.exists():
@@ -156,53 +239,60 @@ class SSHAuthHelper:
         
         use_passphrase = confirm("Protect your SSH key with a passphrase?", default=True)
         
+        keygen = self._which("ssh-keygen")
+        if keygen is None:
+            print(f"{Colors.RED}ssh-keygen not found; please install OpenSSH{Colors.RESET}")
+            return False
+        
         # Generate the key
         print(f"\n{Colors.BLUE}Generating {key_type} key...{Colors.RESET}")
         
         # Create SSH directory if it doesn't exist with secure permissions
         old_umask = os.umask(0o077)  # Temporarily restrict permissions
         try:
-            self.ssh_dir.mkdir(mode=0o700, exist_ok=True)
-            
-            # Pre-create the key file with correct permissions (atomic)
-            key_file.touch(mode=0o600)
-            public_key_file = Path(str(key_file) + ".pub")
-            
-            # Generate key
-            cmd = [
-                "ssh-keygen",
-                "-t", key_type,
-                "-C", email,
-                "-f", str(key_file)
-            ]
-            
-            if key_type == "ed25519":
-                cmd.extend(["-a", "100"])  # More secure key derivation
-            elif key_type == "rsa":
-                cmd.extend(["-b", "4096"])  # 4096 bit RSA
-            
-            if not use_passphrase:
-                cmd.extend(["-N", ""])  # Empty passphrase if user declined
-            
-            # Run ssh-keygen
-            result = subprocess.run(cmd, capture_output=False, text=True)
-            
-            if result.returncode != 0:
-                print(f"{Colors.RED}Failed to generate SSH key{Colors.RESET}")
-                # Clean up failed key files
-                key_file.unlink(missing_ok=True)
-                public_key_file.unlink(missing_ok=True)
-                return False
-            
-            print(f"{Colors.GREEN}✅ SSH key generated successfully!{Colors.RESET}")
-            
-            # Verify and fix permissions (defensive)
-            if key_file.stat().st_mode & 0o077 != 0:
-                key_file.chmod(0o600)
-            if public_key_file.exists() and public_key_file.stat().st_mode & 0o133 != 0:
-                public_key_file.chmod(0o644)
-        finally:
-            os.umask(old_umask)  # Restore original umask
+            try:
+                self.ssh_dir.mkdir(mode=0o700, exist_ok=True)
+                
+                # Pre-create the key file with correct permissions (atomic)
+                key_file.touch(mode=0o600)
+                public_key_file = Path(str(key_file) + ".pub")
+                
+                # Generate key
+                cmd = [
+                    keygen,
+                    "-t", key_type,
+                    "-C", email,
+                    "-f", str(key_file)
+                ]
+                
+                if key_type == "ed25519":
+                    cmd.extend(["-a", "100"])  # More secure key derivation
+                elif key_type == "rsa":
+                    cmd.extend(["-b", "4096"])  # 4096 bit RSA
+                
+                if not use_passphrase:
+                    cmd.extend(["-N", ""])  # Empty passphrase if user declined
+                
+                # Run ssh-keygen
+                result = subprocess.run(cmd, capture_output=False, text=True)
+                
+                if result.returncode != 0:
+                    print(f"{Colors.RED}Failed to generate SSH key{Colors.RESET}")
+                    # Clean up failed key files
+                    key_file.unlink(missing_ok=True)
+                    public_key_file.unlink(missing_ok=True)
+                    return False
+                
+                print(f"{Colors.GREEN}✅ SSH key generated successfully!{Colors.RESET}")
+                self._invalidate_status()
+                
+                # Verify and fix permissions (defensive)
+                if key_file.stat().st_mode & 0o077 != 0:
+                    key_file.chmod(0o600)
+                if public_key_file.exists() and public_key_file.stat().st_mode & 0o133 != 0:
+                    public_key_file.chmod(0o644)
+            finally:
+                os.umask(old_umask)  # Restore original umask
             
             # Add to SSH agent
             if self._add_key_to_agent(key_file):
@@ -221,11 +311,7 @@ class SSHAuthHelper:
         print(f"\n{Colors.BLUE}Using existing SSH key...{Colors.RESET}")
         
         # Find existing keys
-        existing_keys = []
-        for key_type, key_path, _ in self.ssh_key_types:
-            key_file = Path(os.path.expanduser(key_path))
-            if key_file.exists():
-                existing_keys.append(key_file)
+        existing_keys = self._existing_keys()
         
         if not existing_keys:
             print(f"{Colors.RED}No existing SSH keys found{Colors.RESET}")
@@ -255,7 +341,7 @@ class SSHAuthHelper:
             print(f"{Colors.GREEN}✅ Key added to SSH agent{Colors.RESET}")
         
         # Check if key is already on GitHub
-        if self._verify_github_auth():
+        if self._github_verified():
             print(f"{Colors.GREEN}✅ SSH key is already configured with GitHub!{Colors.RESET}")
             return True
         
@@ -274,9 +360,8 @@ class SSHAuthHelper:
         
         # Read public key
         try:
-            with open(public_key_file, 'r') as f:
-                public_key = f.read().strip()
-        except Exception as e:
+            public_key = public_key_file.read_text().strip()
+        except (OSError, UnicodeDecodeError) as e:
             print(f"{Colors.RED}Could not read public key: {e}{Colors.RESET}")
             return False
         
@@ -299,25 +384,29 @@ class SSHAuthHelper:
         print("5. Key: Paste the public key (already copied to clipboard)")
         print("6. Click 'Add SSH key'")
         
-        print(f"\n{Colors.YELLOW}Press Enter after you've added the key to GitHub...{Colors.RESET}")
-        input()
-        
-        # Verify GitHub authentication
-        print(f"\n{Colors.BLUE}Testing GitHub authentication...{Colors.RESET}")
-        if self._verify_github_auth():
-            print(f"{Colors.GREEN}✅ Successfully authenticated with GitHub!{Colors.RESET}")
-            return True
-        else:
+        # Retries only repeat the check; the key is already shown and copied
+        while True:
+            print(f"\n{Colors.YELLOW}Press Enter after you've added the key to GitHub...{Colors.RESET}")
+            input()
+            
+            # Verify GitHub authentication; the key was just added, so probe afresh
+            print(f"\n{Colors.BLUE}Testing GitHub authentication...{Colors.RESET}")
+            if self._github_verified(fresh=True):
+                print(f"{Colors.GREEN}✅ Successfully authenticated with GitHub!{Colors.RESET}")
+                return True
+            
             print(f"{Colors.RED}❌ Could not verify GitHub authentication{Colors.RESET}")
             print("Please ensure you've added the key correctly to GitHub")
             
-            if confirm("Try again?", default=True):
-                return self._setup_github_key(public_key_file)
-            
-            return False
+            if not confirm("Try again?", default=True):
+                return False
     
-    def _check_ssh_agent(self) -> bool:
-        """Check if SSH agent is running"""
+    def _probe_agent(self) -> Tuple[bool, List[str]]:
+        """Run one `ssh-add -l` for both agent state and loaded keys, reused for _AGENT_TTL"""
+        cached = self._agent_cache
+        if cached is not None and time.monotonic() - cached[0] < _AGENT_TTL:
+            return cached[1]
+        
         try:
             result = subprocess.run(
                 ["ssh-add", "-l"],
@@ -326,30 +415,42 @@ class SSHAuthHelper:
                 timeout=5
             )
             # Return code 0 or 1 means agent is running (1 = no keys loaded)
-            return result.returncode in [0, 1]
-        except:
-            return False
+            keys = result.stdout.strip().split('\n') if result.returncode == 0 else []
+            probe = (result.returncode in (0, 1), keys)
+        except Exception:
+            probe = (False, [])
+        
+        self._agent_cache = (time.monotonic(), probe)
+        return probe
+    
+    def _check_ssh_agent(self) -> bool:
+        """Check if SSH agent is running"""
+        return self._probe_agent()[0]
     
     def _start_ssh_agent(self) -> bool:
         """Start SSH agent if not running"""
         if self._check_ssh_agent():
             return True
         
+        agent = self._which("ssh-agent")
+        if agent is None:
+            self.logger.error("Failed to start SSH agent: ssh-agent not found")
+            return False
+        
         try:
             # Start ssh-agent
             result = subprocess.run(
-                ["ssh-agent", "-s"],
+                [agent, "-s"],
                 capture_output=True,
-                text=True
+                text=True,
+                timeout=5
             )
             
             if result.returncode == 0:
+                self._agent_cache = None
                 # Parse output and set environment variables
-                for line in result.stdout.split('\n'):
-                    if line.startswith('SSH_'):
-                        parts = line.split(';')[0].split('=')
-                        if len(parts) == 2:
-                            os.environ[parts[0]] = parts[1]
+                for name, value in _AGENT_RE.findall(result.stdout):
+                    os.environ[name] = value
                 
                 return True
         except Exception as e:
@@ -366,33 +467,25 @@ class SSHAuthHelper:
         
         try:
             # Add key to agent
+            # Longer limit: ssh-add may be waiting for the key's passphrase
             result = subprocess.run(
                 ["ssh-add", str(key_file)],
                 capture_output=True,
-                text=True
+                text=True,
+                timeout=_PASSPHRASE_TIMEOUT
             )
             
-            return result.returncode == 0
+            if result.returncode != 0:
+                return False
+            self._invalidate_status()
+            return True
         except Exception as e:
             self.logger.error(f"Failed to add key to agent: {e}")
             return False
     
     def _get_loaded_keys(self) -> list:
         """Get list of keys loaded in SSH agent"""
-        try:
-            result = subprocess.run(
-                ["ssh-add", "-l"],
-                capture_output=True,
-                text=True
-            )
-            
-            if result.returncode == 0:
-                return result.stdout.strip().split('\n')
-            
-        except:
-            pass
-        
-        return []
+        return list(self._probe_agent()[1])
     
     def _verify_github_auth(self) -> bool:
         """Verify GitHub SSH authentication"""
@@ -414,27 +507,36 @@ class SSHAuthHelper:
         
         return False
     
+    def _which(self, name: str) -> Optional[str]:
+        """Locate a tool with shutil.which once, instead of by failed spawns"""
+        if name not in self._bin:
+            self._bin[name] = shutil.which(name)
+        return self._bin[name]
+    
     def _copy_to_clipboard(self, text: str) -> bool:
         """Copy text to clipboard (platform-specific)"""
-        system = platform.system()
+        if self._clip_cmd is None:
+            return False
         
-        try:
-            if system == "Darwin":  # macOS
-                subprocess.run(["pbcopy"], input=text, text=True, check=True)
-                return True
-            elif system == "Linux":
-                # Try xclip first, then xsel
-                for cmd in [["xclip", "-selection", "clipboard"], ["xsel", "--clipboard", "--input"]]:
-                    try:
-                        subprocess.run(cmd, input=text, text=True, check=True)
-                        return True
-                    except:
-                        continue
-            elif system == "Windows":
-                subprocess.run(["clip"], input=text, text=True, check=True)
+        if self._clip_cmd is not False:
+            try:
+                subprocess.run(self._clip_cmd, input=text, text=True, check=True, timeout=5)
                 return True
-        except:
-            pass
+            except Exception:
+                return False
+        
+        # First call: remember the first installed command that works
+        self._clip_cmd = None
+        for cmd in _CLIPBOARD_COMMANDS.get(platform.system(), []):
+            exe = shutil.which(cmd[0])
+            if exe is None:
+                continue
+            try:
+                subprocess.run([exe] + cmd[1:], input=text, text=True, check=True, timeout=5)
+            except Exception:
+                continue
+            self._clip_cmd = [exe] + cmd[1:]
+            return True
         
         return False
     
@@ -444,27 +546,42 @@ class SSHAuthHelper:
             # Create SSH directory if it doesn't exist
             self.ssh_dir.mkdir(mode=0o700, exist_ok=True)
             
-            # Check if GitHub is already in known_hosts
-            if self.known_hosts.exists():
-                with open(self.known_hosts, 'r') as f:
-                    if "github.com" in f.read():
-                        return True
+            # Check if GitHub is already in known_hosts, stopping at the first hit
+            try:
+                has_entries = os.path.getsize(self.known_hosts) > 0
+            except OSError:
+                has_entries = False
+            if has_entries:
+                with open(self.known_hosts, 'r', buffering=65536) as f:
+                    for line in f:
+                        if "github.com" in line:
+                            return True
             
             # Add GitHub's SSH key
             print(f"{Colors.BLUE}Adding GitHub to known hosts...{Colors.RESET}")
             
-            # Get GitHub's SSH key
+            keyscan = self._which("ssh-keyscan")
+            if keyscan is None:
+                self.logger.error("Failed to add GitHub to known_hosts: ssh-keyscan not found")
+                return False
+            
+            # Get all of GitHub's host keys in one scan, kept as raw bytes
+            # since they are written back verbatim
             result = subprocess.run(
-                ["ssh-keyscan", "-t", "rsa", "github.com"],
+                [keyscan, "-t", "ed25519,ecdsa,rsa", "-T", "5", "github.com"],
                 capture_output=True,
-                text=True
+                timeout=10
             )
             
             if result.returncode == 0 and result.stdout:
-                with open(self.known_hosts, 'a') as f:
-                    f.write(result.stdout)
-                
-                self.known_hosts.chmod(0o644)
+                # O_APPEND keeps the write atomic; new files get 0o644 directly
+                payload = result.stdout
+                fd = os.open(self.known_hosts, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                try:
+                    while payload:
+                        payload = payload[os.write(fd, payload):]
+                finally:
+                    os.close(fd)
                 return True
             
         except Exception as e:
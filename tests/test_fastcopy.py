@@ -0,0 +1,42 @@
+"""Tests for setup.utils.fastcopy"""
+
+import os
+import shutil
+
+import pytest
+
+from setup.utils.fastcopy import copy_batch, fastcopy, install_executable
+
+
+def test_copy_onto_itself_keeps_source(tmp_path):
+    src = tmp_path / "agent.md"
+    src.write_text("# agent\n")
+
+    with pytest.raises(shutil.SameFileError):
+        fastcopy(src, src)
+    with pytest.raises(shutil.SameFileError):
+        copy_batch([(src, src)], copy_stat=False)
+
+    assert src.read_text() == "# agent\n"
+
+
+def test_copy_onto_hard_link_keeps_source(tmp_path):
+    src = tmp_path / "agent.md"
+    src.write_text("# agent\n")
+    dst = tmp_path / "linked.md"
+    os.link(src, dst)
+
+    with pytest.raises(shutil.SameFileError):
+        install_executable(src, dst)
+
+    assert src.read_text() == "# agent\n"
+
+
+def test_copy_replaces_longer_target(tmp_path):
+    src = tmp_path / "src.md"
+    src.write_text("new\n")
+    dst = tmp_path / "dst.md"
+    dst.write_text("old and much longer\n")
+
+    assert copy_batch([(src, dst)], copy_stat=False) == [True]
+    assert dst.read_text() == "new\n"